@@ -1,20 +1,45 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import geopandas as gpd
-import ezdxf
-from ezdxf import recover
-from ezdxf.addons import odafc
-from shapely.geometry import Point, LineString, Polygon
+import shapely
+try:
+    import pyogrio
+    gpd.options.io_engine = 'pyogrio'
+except ImportError:
+    pyogrio = None
+import shutil
 import tempfile
 import os
 import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pyproj import CRS
 import io
+import logging
+import re
 import traceback
 
+logger = logging.getLogger("fileconverter")
+logger.setLevel(logging.WARNING)
+
+class BufferedLogHandler(logging.Handler):
+    """Collects records in memory; main() renders them once per rerun."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+
+log_buffer = BufferedLogHandler()
+
 def log_debug(message):
-    st.sidebar.text(f"Debug: {message}")
+    logger.debug(message)
 
+@st.cache_data
 def get_crs_options():
     return {
         'EPSG:4326': 'WGS 84',
@@ -27,24 +52,133 @@ def get_crs_options():
         'EPSG:3857': 'WGS 84 / Pseudo-Mercator',
     }
 
-def process_csv(file, crs):
+@lru_cache(maxsize=None)
+def make_crs(code):
+    return CRS(code)
+
+@st.cache_resource
+def load_ezdxf():
+    # ezdxf is only needed for CAD uploads; importing it lazily keeps
+    # CSV-only sessions from paying the module load cost.
+    import ezdxf
+    from ezdxf import recover
+    return ezdxf, recover
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def tokenize_coords(buf, out):
+        """Scan a byte buffer for -?digits[.digits] tokens, filling out; returns the count."""
+        n = 0
+        i = 0
+        length = buf.shape[0]
+        while i < length:
+            c = buf[i]
+            if (48 <= c <= 57) or c == 45 or c == 46:
+                sign = 1.0
+                if c == 45:
+                    sign = -1.0
+                    i += 1
+                value = 0.0
+                while i < length and 48 <= buf[i] <= 57:
+                    value = value * 10.0 + (buf[i] - 48)
+                    i += 1
+                if i < length and buf[i] == 46:
+                    i += 1
+                    frac = 0.1
+                    while i < length and 48 <= buf[i] <= 57:
+                        value += (buf[i] - 48) * frac
+                        frac *= 0.1
+                        i += 1
+                out[n] = sign * value
+                n += 1
+            else:
+                i += 1
+        return n
+else:
+    tokenize_coords = None
+
+def parse_coord_string(s):
+    """Parse a coordinate string like '[(1.0, 2.0), (3.0, 4.0)]' into an (n, 2) float array."""
+    if tokenize_coords is not None:
+        buf = np.frombuffer(s.encode('ascii', 'replace'), dtype=np.uint8)
+        out = np.empty(buf.shape[0] // 2 + 2, dtype=np.float64)
+        n = tokenize_coords(buf, out)
+        return out[:n].reshape(-1, 2)
+    arr = np.fromstring(re.sub(r'[^\d.\- ]', ' ', s), sep=' ')
+    return arr.reshape(-1, 2)
+
+def geoms_from_coord_strings(series, kind):
+    parts = [parse_coord_string(s) for s in series]
+    coords = np.concatenate(parts)
+    indices = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+    if kind == 'polygon':
+        return shapely.polygons(shapely.linearrings(coords, indices=indices))
+    return shapely.linestrings(coords, indices=indices)
+
+def read_csv_frame(file, usecols=None, dtype=None):
+    try:
+        return pd.read_csv(file, usecols=usecols, dtype=dtype,
+                           engine='pyarrow', dtype_backend='pyarrow')
+    except (ImportError, ValueError):
+        log_debug("pyarrow engine unavailable, falling back to default parser")
+        return pd.read_csv(file, usecols=usecols, dtype=dtype)
+
+def find_coord_columns(columns):
+    """Locate the latitude/longitude pair case-insensitively, accepting common aliases."""
+    cols = {c.lower(): c for c in columns}
+    lat = cols.get('latitude') or cols.get('lat') or cols.get('y')
+    lon = cols.get('longitude') or cols.get('lon') or cols.get('x')
+    return lat, lon
+
+def process_csv(file, crs, strict_columns=False):
     try:
         log_debug("Reading CSV file")
-        df = pd.read_csv(file)
+        usecols = dtype = None
+        if strict_columns:
+            header = pd.read_csv(file, nrows=0).columns
+            lat, lon = find_coord_columns(header)
+            if lat and lon:
+                id_col = {c.lower(): c for c in header}.get('id')
+                usecols = [c for c in (id_col, lat, lon) if c]
+                dtype = {lat: 'float64', lon: 'float64'}
+        df = read_csv_frame(file, usecols=usecols, dtype=dtype)
         log_debug(f"CSV columns: {df.columns.tolist()}")
-        
+
         geometry_column = None
-        if 'latitude' in df.columns and 'longitude' in df.columns:
-            log_debug("Using latitude and longitude columns")
-            geometry = [Point(xy) for xy in zip(df['longitude'], df['latitude'])]
-        elif 'x' in df.columns and 'y' in df.columns:
-            log_debug("Using x and y columns")
-            geometry = [Point(xy) for xy in zip(df['x'], df['y'])]
+        cols = {c.lower(): c for c in df.columns}
+        lat, lon = find_coord_columns(df.columns)
+        if lat and lon:
+            log_debug(f"Using coordinate columns: {lat}, {lon}")
+            geometry = gpd.points_from_xy(
+                df[lon].to_numpy(dtype='float64'),
+                df[lat].to_numpy(dtype='float64')
+            )
+        elif 'polygon' in cols:
+            log_debug("Using polygon column")
+            geometry = geoms_from_coord_strings(df[cols['polygon']], 'polygon')
+        elif 'linestring' in cols:
+            log_debug("Using linestring column")
+            geometry = geoms_from_coord_strings(df[cols['linestring']], 'linestring')
         elif 'geometry' in df.columns:
             log_debug("Using geometry column")
-            geometry_column = 'geometry'
+            values = df['geometry'].to_numpy()
+            if len(values) and isinstance(values[0], str):
+                log_debug("Parsing geometry column as WKT")
+                geometry = shapely.from_wkt(values)
+                df = df.drop(columns=['geometry'])
+            elif len(values) and isinstance(values[0], (bytes, bytearray)):
+                log_debug("Parsing geometry column as WKB")
+                geometry = shapely.from_wkb(values)
+                df = df.drop(columns=['geometry'])
+            else:
+                geometry_column = 'geometry'
         else:
-            raise ValueError("CSV must contain 'latitude' and 'longitude', 'x' and 'y', or 'geometry' columns.")
+            raise ValueError("CSV must contain 'latitude' and 'longitude', 'x' and 'y', 'polygon', 'linestring', or 'geometry' columns.")
         
         log_debug("Creating GeoDataFrame")
         if geometry_column:
@@ -58,55 +192,300 @@ def process_csv(file, crs):
         log_debug(f"Traceback: {traceback.format_exc()}")
         raise
 
+DXF_ATTRS = ('layer', 'color', 'lineweight', 'linetype', 'handle')
+
+# Re-parsing the DXF in each worker only pays off on large files.
+PARALLEL_ENTITY_THRESHOLD = 50000
+
+def append_attr_row(cols, entity):
+    dxf = entity.dxf
+    cols['dxftype'].append(entity.dxftype())
+    for attr in DXF_ATTRS:
+        cols[attr].append(getattr(dxf, attr, None))
+
+def new_cad_buffers():
+    return {
+        'pt_xy': [], 'pt_cols': defaultdict(list),
+        'line_coords': [], 'line_idx': [], 'line_cols': defaultdict(list),
+        'poly_coords': [], 'poly_idx': [], 'poly_cols': defaultdict(list),
+        'circ_xy': [], 'circ_r': [], 'circle_cols': defaultdict(list),
+        'n_lines': 0, 'n_rings': 0,
+    }
+
+def handle_point(entity, buffers):
+    # Vec3 does not support slicing, so pull the components explicitly.
+    loc = entity.dxf.location
+    append_attr_row(buffers['pt_cols'], entity)
+    buffers['pt_xy'].append((loc.x, loc.y))
+
+def append_line(points, entity, buffers):
+    n = buffers['n_lines']
+    append_attr_row(buffers['line_cols'], entity)
+    buffers['line_coords'].extend(points)
+    buffers['line_idx'].extend((n, n))
+    buffers['n_lines'] = n + 1
+
+def handle_line(entity, buffers):
+    dxf = entity.dxf
+    start, end = dxf.start, dxf.end
+    append_line(((start.x, start.y), (end.x, end.y)), entity, buffers)
+
+def polyline_points(entity):
+    """Extract (x, y) vertex tuples without unpacking bulge/width data."""
+    if entity.dxftype() == 'LWPOLYLINE':
+        with entity.points('xy') as pts:
+            return list(pts)
+    return [p[:2] for p in entity.get_points()]
+
+def handle_polyline(entity, buffers):
+    points = polyline_points(entity)
+    if len(points) > 2:
+        n = buffers['n_rings']
+        append_attr_row(buffers['poly_cols'], entity)
+        buffers['poly_coords'].extend(points)
+        buffers['poly_idx'].extend([n] * len(points))
+        buffers['n_rings'] = n + 1
+    elif len(points) == 2:
+        append_line(points, entity, buffers)
+
+def handle_circle(entity, buffers):
+    dxf = entity.dxf
+    center = dxf.center
+    append_attr_row(buffers['circle_cols'], entity)
+    buffers['circ_xy'].append((center.x, center.y))
+    buffers['circ_r'].append(dxf.radius)
+
+CAD_HANDLERS = {
+    'POINT': handle_point,
+    'LINE': handle_line,
+    'LWPOLYLINE': handle_polyline,
+    'POLYLINE': handle_polyline,
+    'CIRCLE': handle_circle,
+}
+
+def extract_cad_buffers(entities):
+    """Walk DXF entities once, collecting raw coordinates per geometry type."""
+    buffers = new_cad_buffers()
+    handlers = CAD_HANDLERS
+    for entity in entities:
+        dxftype = entity.dxftype()
+        handler = handlers.get(dxftype)
+        if handler is None:
+            continue
+        try:
+            handler(entity, buffers)
+        except Exception as e:
+            log_debug(f"Error processing entity {dxftype}: {str(e)}")
+    return buffers
+
+def extract_cad_buffers_query(msp):
+    """Per-type msp.query passes with coordinate arrays preallocated from the query length."""
+    buffers = new_cad_buffers()
+
+    points = msp.query('POINT')
+    if len(points):
+        xy = np.empty((len(points), 2), dtype='float64')
+        pt_cols = buffers['pt_cols']
+        for i, entity in enumerate(points):
+            loc = entity.dxf.location
+            xy[i, 0] = loc[0]
+            xy[i, 1] = loc[1]
+            append_attr_row(pt_cols, entity)
+        buffers['pt_xy'] = xy
+
+    lines = msp.query('LINE')
+    if len(lines):
+        coords = np.empty((len(lines) * 2, 2), dtype='float64')
+        line_cols = buffers['line_cols']
+        for i, entity in enumerate(lines):
+            dxf = entity.dxf
+            start, end = dxf.start, dxf.end
+            coords[2 * i, 0] = start[0]
+            coords[2 * i, 1] = start[1]
+            coords[2 * i + 1, 0] = end[0]
+            coords[2 * i + 1, 1] = end[1]
+            append_attr_row(line_cols, entity)
+        buffers['line_coords'] = coords
+        buffers['line_idx'] = np.repeat(np.arange(len(lines)), 2)
+        buffers['n_lines'] = len(lines)
+
+    # Polylines are ragged, so they stay on list accumulation; two-vertex
+    # polylines are collected separately and joined onto the LINE buffers.
+    extra_coords = []
+    extra_idx = []
+    poly_coords = buffers['poly_coords']
+    poly_idx = buffers['poly_idx']
+    for entity in msp.query('LWPOLYLINE POLYLINE'):
+        try:
+            pts = polyline_points(entity)
+            if len(pts) > 2:
+                n = buffers['n_rings']
+                append_attr_row(buffers['poly_cols'], entity)
+                poly_coords.extend(pts)
+                poly_idx.extend([n] * len(pts))
+                buffers['n_rings'] = n + 1
+            elif len(pts) == 2:
+                n = buffers['n_lines']
+                append_attr_row(buffers['line_cols'], entity)
+                extra_coords.extend(pts)
+                extra_idx.extend((n, n))
+                buffers['n_lines'] = n + 1
+        except Exception as e:
+            log_debug(f"Error processing entity {entity.dxftype()}: {str(e)}")
+    if extra_coords:
+        extra_coords = np.asarray(extra_coords, dtype='float64')
+        extra_idx = np.asarray(extra_idx)
+        if len(buffers['line_coords']):
+            buffers['line_coords'] = np.concatenate([buffers['line_coords'], extra_coords])
+            buffers['line_idx'] = np.concatenate([buffers['line_idx'], extra_idx])
+        else:
+            buffers['line_coords'] = extra_coords
+            buffers['line_idx'] = extra_idx
+
+    circles = msp.query('CIRCLE')
+    if len(circles):
+        circ_xy = np.empty((len(circles), 2), dtype='float64')
+        circ_r = np.empty(len(circles), dtype='float64')
+        circle_cols = buffers['circle_cols']
+        for i, entity in enumerate(circles):
+            dxf = entity.dxf
+            center = dxf.center
+            circ_xy[i, 0] = center[0]
+            circ_xy[i, 1] = center[1]
+            circ_r[i] = dxf.radius
+            append_attr_row(circle_cols, entity)
+        buffers['circ_xy'] = circ_xy
+        buffers['circ_r'] = circ_r
+
+    return buffers
+
+def extract_chunk_buffers(file_path, start, stop):
+    """Worker for parallel extraction: re-open the DXF and process one slice."""
+    import ezdxf
+    doc = ezdxf.readfile(file_path, errors='ignore')
+    entities = list(doc.modelspace())[start:stop]
+    return extract_cad_buffers(entities)
+
+def merge_cad_buffers(chunks):
+    merged = new_cad_buffers()
+    for buffers in chunks:
+        merged['pt_xy'].extend(buffers['pt_xy'])
+        line_base = merged['n_lines']
+        merged['line_coords'].extend(buffers['line_coords'])
+        merged['line_idx'].extend(i + line_base for i in buffers['line_idx'])
+        merged['n_lines'] += buffers['n_lines']
+        ring_base = merged['n_rings']
+        merged['poly_coords'].extend(buffers['poly_coords'])
+        merged['poly_idx'].extend(i + ring_base for i in buffers['poly_idx'])
+        merged['n_rings'] += buffers['n_rings']
+        merged['circ_xy'].extend(buffers['circ_xy'])
+        merged['circ_r'].extend(buffers['circ_r'])
+        for group in ('pt_cols', 'line_cols', 'poly_cols', 'circle_cols'):
+            for key, col in buffers[group].items():
+                merged[group][key].extend(col)
+    return merged
+
+def extract_cad_buffers_parallel(file_path, n_entities):
+    """Split the entity range across a process pool; each worker re-opens the file."""
+    workers = min(os.cpu_count() or 1, 8)
+    bounds = np.linspace(0, n_entities, workers + 1, dtype=int)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = list(executor.map(
+            extract_chunk_buffers, [file_path] * workers, bounds[:-1], bounds[1:]
+        ))
+    return merge_cad_buffers(chunks)
+
+def offsets_from_indices(indices, n_geoms):
+    """Convert per-coordinate geometry indices into a ragged offsets array."""
+    offsets = np.zeros(n_geoms + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_geoms), out=offsets[1:])
+    return offsets
+
+def assemble_cad_gdf(buffers, crs):
+    """Build all geometries from the collected buffers with bulk shapely calls."""
+    geom_arrays = []
+    col_groups = []
+    counts = []
+    if len(buffers['pt_xy']):
+        geom_arrays.append(shapely.from_ragged_array(
+            shapely.GeometryType.POINT,
+            np.asarray(buffers['pt_xy'], dtype='float64')
+        ))
+        col_groups.append(buffers['pt_cols'])
+        counts.append(len(buffers['pt_xy']))
+    if len(buffers['line_coords']):
+        offsets = offsets_from_indices(np.asarray(buffers['line_idx']), buffers['n_lines'])
+        geom_arrays.append(shapely.from_ragged_array(
+            shapely.GeometryType.LINESTRING,
+            np.asarray(buffers['line_coords'], dtype='float64'),
+            (offsets,)
+        ))
+        col_groups.append(buffers['line_cols'])
+        counts.append(buffers['n_lines'])
+    if len(buffers['poly_coords']):
+        n_rings = buffers['n_rings']
+        ring_offsets = offsets_from_indices(np.asarray(buffers['poly_idx']), n_rings)
+        geom_offsets = np.arange(n_rings + 1, dtype=np.int64)
+        geom_arrays.append(shapely.from_ragged_array(
+            shapely.GeometryType.POLYGON,
+            np.asarray(buffers['poly_coords'], dtype='float64'),
+            (ring_offsets, geom_offsets)
+        ))
+        col_groups.append(buffers['poly_cols'])
+        counts.append(n_rings)
+    if len(buffers['circ_xy']):
+        geom_arrays.append(shapely.buffer(
+            shapely.points(np.asarray(buffers['circ_xy'], dtype='float64')),
+            np.asarray(buffers['circ_r'], dtype='float64'),
+            quad_segs=8
+        ))
+        col_groups.append(buffers['circle_cols'])
+        counts.append(len(buffers['circ_xy']))
+
+    if not geom_arrays:
+        return None
+
+    keys = []
+    for cols in col_groups:
+        for key in cols:
+            if key not in keys:
+                keys.append(key)
+    data = {}
+    for key in keys:
+        merged = []
+        for cols, count in zip(col_groups, counts):
+            col = cols.get(key, [])
+            merged.extend(col)
+            merged.extend([None] * (count - len(col)))
+        data[key] = merged
+
+    return gpd.GeoDataFrame(data, geometry=np.concatenate(geom_arrays), crs=crs)
+
 def process_cad(file_path, crs):
     try:
         log_debug(f"Processing CAD file: {file_path}")
+        ezdxf, recover = load_ezdxf()
+        recovered = False
         try:
-            doc = ezdxf.readfile(file_path)
+            doc = ezdxf.readfile(file_path, errors='ignore')
         except ezdxf.DXFStructureError:
             log_debug("Error reading CAD file, attempting recovery")
             doc, auditor = recover.readfile(file_path)
+            recovered = True
             if auditor.has_errors:
                 log_debug(f"Errors found during recovery: {auditor.errors}")
-        
+
         msp = doc.modelspace()
-        entities = []
-        
-        for entity in msp:
-            try:
-                geom = None
-                properties = {'dxftype': entity.dxftype()}
-                
-                if entity.dxftype() == 'POINT':
-                    geom = Point(entity.dxf.location[:2])
-                elif entity.dxftype() == 'LINE':
-                    geom = LineString([entity.dxf.start[:2], entity.dxf.end[:2]])
-                elif entity.dxftype() in ['LWPOLYLINE', 'POLYLINE']:
-                    points = entity.get_points()
-                    if len(points) > 2:
-                        geom = Polygon(points)
-                    elif len(points) == 2:
-                        geom = LineString(points)
-                elif entity.dxftype() == 'CIRCLE':
-                    center = entity.dxf.center
-                    radius = entity.dxf.radius
-                    geom = Point(center).buffer(radius)
-                
-                if geom:
-                    for attr in entity.dxf.all_existing_dxf_attribs():
-                        properties[attr] = str(getattr(entity.dxf, attr))
-                    entities.append({'geometry': geom, 'properties': properties})
-            except Exception as e:
-                log_debug(f"Error processing entity {entity.dxftype()}: {str(e)}")
-        
-        log_debug(f"Processed {len(entities)} entities")
-        
-        if entities:
-            gdf = gpd.GeoDataFrame(
-                [e['properties'] for e in entities],
-                geometry=[e['geometry'] for e in entities],
-                crs=crs
-            )
+        n_entities = len(msp)
+        if (n_entities >= PARALLEL_ENTITY_THRESHOLD
+                and not recovered and (os.cpu_count() or 1) > 1):
+            log_debug(f"Extracting {n_entities} entities in parallel")
+            buffers = extract_cad_buffers_parallel(file_path, n_entities)
+        else:
+            buffers = extract_cad_buffers_query(msp)
+        gdf = assemble_cad_gdf(buffers, crs)
+
+        if gdf is not None:
             log_debug(f"GeoDataFrame created with {len(gdf)} rows")
             return gdf
         else:
@@ -116,29 +495,102 @@ def process_cad(file_path, crs):
         log_debug(f"Traceback: {traceback.format_exc()}")
         raise
 
+OUTPUT_FORMATS = {
+    'Shapefile': ('ESRI Shapefile', '.shp'),
+    'GeoPackage': ('GPKG', '.gpkg'),
+    'FlatGeobuf': ('FlatGeobuf', '.fgb'),
+}
+
+def save_vector_file(gdf, output_filename, output_format):
+    """Write a single-file format (GeoPackage/FlatGeobuf) and return its bytes."""
+    driver, ext = OUTPUT_FORMATS[output_format]
+    with fast_tmpdir() as tmpdir:
+        path = os.path.join(tmpdir, f"{output_filename}{ext}")
+        log_debug(f"Saving {output_format} to {path}")
+        if pyogrio is not None:
+            pyogrio.write_dataframe(gdf, path, driver=driver, use_arrow=True)
+        else:
+            gdf.to_file(path, driver=driver)
+        with open(path, 'rb') as f:
+            return f.read()
+
+def fast_tmpdir():
+    """Temporary directory on tmpfs when available, so intermediate files move at memory speed."""
+    return tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+
 def convert_dwg_to_dxf(dwg_file_path):
+    from ezdxf.addons import odafc
     dxf_file_path = dwg_file_path.replace('.dwg', '.dxf')
     log_debug(f"Converting DWG to DXF: {dwg_file_path} -> {dxf_file_path}")
     odafc.convert(dwg_file_path, dxf_file_path)
     return dxf_file_path
 
-def save_and_zip_shapefile(gdf, output_filename):
+@st.cache_data(show_spinner=False)
+def csv_bytes_to_gdf(raw, crs_code, strict_columns):
+    """Parse CSV bytes into a GeoDataFrame, cached on content, CRS and column mode."""
+    with fast_tmpdir() as tmpdir:
+        path = os.path.join(tmpdir, "upload.csv")
+        with open(path, 'wb') as f:
+            f.write(raw)
+        return process_csv(path, make_crs(crs_code), strict_columns)
+
+@st.cache_data(show_spinner=False)
+def cad_bytes_to_gdf(raw, suffix, crs_code):
+    """Parse CAD bytes into a GeoDataFrame, cached on file content and CRS.
+
+    Keyed on the raw upload bytes so widget interactions after the first
+    parse are free; the GeoDataFrame itself is pickled by st.cache_data.
+    """
+    with fast_tmpdir() as tmpdir:
+        path = os.path.join(tmpdir, f"upload{suffix}")
+        with open(path, 'wb') as f:
+            f.write(raw)
+        if suffix == '.dwg':
+            log_debug("Converting DWG to DXF")
+            path = convert_dwg_to_dxf(path)
+        return process_cad(path, make_crs(crs_code))
+
+def create_zip_buffer(gdf, output_filename):
+    """Build the zipped shapefile in memory and return a BytesIO ready for download.
+
+    Streamlit's download marshalling only accepts bytes-like payloads and
+    copies them into memory to serve, so spooling to disk buys nothing here.
+    """
     try:
         log_debug("Saving and zipping shapefile")
-        with tempfile.TemporaryDirectory() as tmpdir:
-            shp_path = os.path.join(tmpdir, output_filename)
-            log_debug(f"Saving shapefile to {shp_path}")
-            gdf.to_file(shp_path)
-            
-            zip_path = f"{output_filename}.zip"
-            log_debug(f"Creating zip file: {zip_path}")
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(tmpdir):
-                    for file in files:
-                        zipf.write(os.path.join(root, file), file)
-            
-            log_debug("Shapefile saved and zipped successfully")
-        return zip_path
+        buf = io.BytesIO()
+        with fast_tmpdir() as tmpdir:
+            if pyogrio is not None:
+                # GDAL's zipped-shapefile dataset name (*.shp.zip) writes all
+                # sidecars straight into the archive in one pass; /vsizip/
+                # cannot create multi-file datasets.
+                zip_path = os.path.join(tmpdir, f"{output_filename}.shp.zip")
+                log_debug(f"Saving shapefile to {zip_path}")
+                pyogrio.write_dataframe(gdf, zip_path, driver='ESRI Shapefile', use_arrow=True)
+                with open(zip_path, 'rb') as f:
+                    shutil.copyfileobj(f, buf, length=1048576)
+            else:
+                shp_path = os.path.join(tmpdir, f"{output_filename}.shp")
+                log_debug(f"Saving shapefile to {shp_path}")
+                gdf.to_file(shp_path, driver='ESRI Shapefile')
+
+                log_debug("Zipping shapefile in memory")
+                # Dense binary members (.shp/.shx) barely compress; store them
+                # as-is and use a fast deflate level for the rest.
+                with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+                    # Shapefile sidecars are flat siblings, so one scandir pass suffices.
+                    with os.scandir(tmpdir) as it:
+                        for entry in it:
+                            if not entry.is_file():
+                                continue
+                            compress = (zipfile.ZIP_STORED
+                                        if entry.name.endswith(('.shp', '.shx'))
+                                        else zipfile.ZIP_DEFLATED)
+                            zipf.write(entry.path, entry.name, compress_type=compress)
+
+        buf.seek(0)
+        log_debug("Shapefile saved and zipped successfully")
+        return buf
     except Exception as e:
         log_debug(f"Error saving shapefile: {str(e)}")
         log_debug(f"Traceback: {traceback.format_exc()}")
@@ -147,6 +599,15 @@ def save_and_zip_shapefile(gdf, output_filename):
 def main():
     st.title('File to Shapefile Converter')
     st.write("This app converts CSV, DXF, or DWG files to shapefiles.")
+
+    verbose = st.sidebar.checkbox("Verbose logging")
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+        if log_buffer not in logger.handlers:
+            logger.addHandler(log_buffer)
+    else:
+        logger.setLevel(logging.WARNING)
+    log_buffer.records.clear()
     log_debug("App started")
 
     file = st.file_uploader("Choose a CSV, DXF, or DWG file", type=["csv", "dxf", "dwg"])
@@ -158,7 +619,6 @@ def main():
         list(crs_options.keys()),
         format_func=lambda x: f"{x} - {crs_options[x]}"
     )
-    crs = CRS(selected_crs)
     log_debug(f"Selected CRS: {selected_crs}")
 
     if file is not None:
@@ -166,49 +626,52 @@ def main():
         file_extension = os.path.splitext(file.name)[1].lower()
         
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-                temp_file.write(file.getvalue())
-                temp_file_path = temp_file.name
-
             if file_extension == '.csv':
                 log_debug("Processing CSV file")
-                gdf = process_csv(temp_file_path, crs)
+                strict_columns = st.checkbox("Only load coordinate columns (faster on wide CSVs)")
+                gdf = csv_bytes_to_gdf(file.getvalue(), selected_crs, strict_columns)
             elif file_extension in ['.dxf', '.dwg']:
-                if file_extension == '.dwg':
-                    log_debug("Converting DWG to DXF")
-                    dxf_file_path = convert_dwg_to_dxf(temp_file_path)
-                    gdf = process_cad(dxf_file_path, crs)
-                    os.unlink(dxf_file_path)
-                else:
-                    gdf = process_cad(temp_file_path, crs)
+                gdf = cad_bytes_to_gdf(file.getvalue(), file_extension, selected_crs)
             else:
                 raise ValueError("Unsupported file format. Please use CSV, DXF, or DWG files.")
 
-            os.unlink(temp_file_path)
-
             if gdf is not None:
-                st.write("Data preview:")
-                st.write(gdf.head())
+                if st.checkbox("Show data preview", value=len(gdf) < 10000):
+                    preview = gdf.head()
+                    st.dataframe(preview.assign(geometry=preview.geometry.to_wkt()))
                 log_debug(f"GeoDataFrame created successfully with {len(gdf)} rows")
 
                 output_filename = st.text_input("Enter output filename (without extension)", "output")
                 log_debug(f"Output filename set to: {output_filename}")
-                
-                if st.button('Convert to Shapefile'):
+                output_format = st.selectbox("Output format", list(OUTPUT_FORMATS.keys()))
+
+                if st.button(f'Convert to {output_format}'):
                     log_debug("Convert button clicked")
-                    with st.spinner('Converting to shapefile...'):
-                        zip_filename = save_and_zip_shapefile(gdf, output_filename)
-                    
-                    log_debug(f"Shapefile created: {zip_filename}")
-                    with open(zip_filename, "rb") as fp:
+                    if output_format == 'Shapefile':
+                        with st.spinner('Converting to shapefile...'):
+                            zip_buffer = create_zip_buffer(gdf, output_filename)
+
+                        zip_filename = f"{output_filename}.zip"
+                        log_debug(f"Shapefile created: {zip_filename}")
                         st.download_button(
                             label="Download Shapefile",
-                            data=fp,
+                            data=zip_buffer,
                             file_name=zip_filename,
                             mime="application/zip"
                         )
-                    st.success(f"Shapefile created and zipped: {zip_filename}")
-                    os.unlink(zip_filename)
+                        st.success(f"Shapefile created and zipped: {zip_filename}")
+                    else:
+                        # Single-file formats skip the zip step entirely.
+                        ext = OUTPUT_FORMATS[output_format][1]
+                        with st.spinner(f'Converting to {output_format}...'):
+                            data = save_vector_file(gdf, output_filename, output_format)
+                        st.download_button(
+                            label=f"Download {output_format}",
+                            data=data,
+                            file_name=f"{output_filename}{ext}",
+                            mime="application/octet-stream"
+                        )
+                        st.success(f"{output_format} created: {output_filename}{ext}")
             else:
                 st.error("Failed to process the file. Please check the file format and try again.")
                 log_debug("Failed to create GeoDataFrame")
@@ -220,5 +683,9 @@ def main():
         st.write("Please upload a CSV, DXF, or DWG file to begin.")
         log_debug("Waiting for file upload")
 
+    if verbose and log_buffer.records:
+        with st.sidebar.expander("Debug log"):
+            st.code("\n".join(log_buffer.records))
+
 if __name__ == "__main__":
     main()
@@ -1,111 +1,163 @@
 import streamlit as st
-import ezdxf
-import json
+import gc
+import numpy as np
+import orjson
 import tempfile
 import os
 from dwg2dxf import convert
+from ezdxf.addons import iterdxf
 
 def convert_dwg_to_dxf(dwg_path):
-    dxf_path = dwg_path.replace('.dwg', '.dxf')
+    # dwg2dxf only converts path to path, so the intermediate DXF cannot be
+    # streamed; stage it in tmpfs where available to keep the write-then-read
+    # round trip off real disk.
+    staging = '/dev/shm' if os.path.isdir('/dev/shm') else None
+    fd, dxf_path = tempfile.mkstemp(suffix='.dxf', dir=staging)
+    os.close(fd)
     convert(dwg_path, dxf_path)
     return dxf_path
 
+def _lwpolyline_geometry(entity):
+    # Pull the bare x/y pairs into one array so the per-vertex
+    # unboxing happens in C instead of a Python loop.
+    coords = np.asarray(entity.get_points('xy'), dtype=np.float64).tolist()
+    if entity.closed:
+        return {"type": "Polygon", "coordinates": [coords]}
+    return {"type": "LineString", "coordinates": coords}
+
+def _make_feature(geometry, layer, dxftype):
+    return {
+        "type": "Feature",
+        "geometry": geometry,
+        "properties": {
+            "layer": layer,
+            "type": dxftype
+        }
+    }
+
 def convert_dxf_to_geojson(dxf_path):
+    """Stream the conversion into a temporary .geojson file and return its path.
+
+    Polylines are serialized as they come off the iterator. POINT and LINE
+    entities have fixed-size coordinates, so their values are accumulated
+    and converted with one numpy call per type instead of per entity.
+    """
     try:
-        # Read the DXF file
-        doc = ezdxf.readfile(dxf_path)
-        msp = doc.modelspace()
-
-        features = []
-
-        for entity in msp:
-            if entity.dxftype() == 'POINT':
-                geometry = {
-                    "type": "Point",
-                    "coordinates": [entity.dxf.location.x, entity.dxf.location.y]
-                }
-            elif entity.dxftype() == 'LINE':
-                geometry = {
-                    "type": "LineString",
-                    "coordinates": [
-                        [entity.dxf.start.x, entity.dxf.start.y],
-                        [entity.dxf.end.x, entity.dxf.end.y]
-                    ]
-                }
-            elif entity.dxftype() == 'LWPOLYLINE':
-                points = list(entity.get_points())
-                geometry = {
-                    "type": "LineString",
-                    "coordinates": [[p[0], p[1]] for p in points]
-                }
-                if entity.closed:
-                    geometry["type"] = "Polygon"
-                    geometry["coordinates"] = [geometry["coordinates"]]
-            else:
-                continue  # Skip unsupported entities
-
-            feature = {
-                "type": "Feature",
-                "geometry": geometry,
-                "properties": {
-                    "layer": entity.dxf.layer,
-                    "type": entity.dxftype()
-                }
-            }
-            features.append(feature)
-
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features
-        }
+        # Stream modelspace entities instead of loading the whole DXF
+        # document into memory; entities are released after use.
+        entities = iterdxf.modelspace(dxf_path)
+
+        pt_values = []
+        pt_layers = []
+        line_values = []
+        line_layers = []
+
+        with tempfile.NamedTemporaryFile(suffix='.geojson', delete=False) as out:
+            out.write(b'{"type": "FeatureCollection", "features": [')
+            first = True
+            for entity in entities:
+                dxftype = entity.dxftype()
+                if dxftype == 'POINT':
+                    location = entity.dxf.location
+                    pt_values.append((location.x, location.y))
+                    pt_layers.append(entity.dxf.layer)
+                elif dxftype == 'LINE':
+                    dxf = entity.dxf
+                    start, end = dxf.start, dxf.end
+                    line_values.append((start.x, start.y, end.x, end.y))
+                    line_layers.append(dxf.layer)
+                elif dxftype == 'LWPOLYLINE':
+                    feature = _make_feature(
+                        _lwpolyline_geometry(entity), entity.dxf.layer, dxftype)
+                    if not first:
+                        out.write(b',')
+                    out.write(orjson.dumps(feature))
+                    first = False
 
-        return geojson
+            # One numpy unboxing pass per fixed-size entity type.
+            pt_coords = np.asarray(pt_values, dtype=np.float64).tolist()
+            for layer, xy in zip(pt_layers, pt_coords):
+                geometry = {"type": "Point", "coordinates": xy}
+                if not first:
+                    out.write(b',')
+                out.write(orjson.dumps(_make_feature(geometry, layer, 'POINT')))
+                first = False
+
+            line_coords = np.asarray(line_values, dtype=np.float64).reshape(-1, 2, 2).tolist()
+            for layer, pair in zip(line_layers, line_coords):
+                geometry = {"type": "LineString", "coordinates": pair}
+                if not first:
+                    out.write(b',')
+                out.write(orjson.dumps(_make_feature(geometry, layer, 'LINE')))
+                first = False
+
+            out.write(b']}')
+
+        return out.name
 
     except Exception as e:
         raise ValueError(f"An error occurred while processing the DXF file: {str(e)}")
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def dwg_bytes_to_geojson(data):
+    """Run the DWG-to-GeoJSON pipeline on raw upload bytes.
+
+    Keyed on the upload content, so re-uploading the same drawing during
+    a session returns the cached result without reconverting.
+    """
+    dwg_path = dxf_path = geojson_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.dwg') as tmp_file:
+            tmp_file.write(data)
+            dwg_path = tmp_file.name
+
+        dxf_path = convert_dwg_to_dxf(dwg_path)
+        geojson_path = convert_dxf_to_geojson(dxf_path)
+        with open(geojson_path, 'rb') as geojson_file:
+            return geojson_file.read()
+    finally:
+        # Clean up temporary files
+        for path in (dwg_path, dxf_path, geojson_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
 st.title('DWG to GeoJSON Converter')
 
 uploaded_file = st.file_uploader("Choose a DWG file", type=['dwg'])
 
 if uploaded_file is not None:
     try:
-        # Save uploaded file to a temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.dwg') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            dwg_path = tmp_file.name
+        data = uploaded_file.getvalue()
+        # Streamlit pins the upload buffer for the session; drop our
+        # reference before conversion starts allocating so peak memory
+        # is not the upload plus the DXF object graph.
+        uploaded_file.close()
+        del uploaded_file
+        gc.collect()
 
-        # Convert DWG to DXF
-        dxf_path = convert_dwg_to_dxf(dwg_path)
+        geojson_bytes = dwg_bytes_to_geojson(data)
+        del data
 
-        # Convert DXF to GeoJSON
-        geojson = convert_dxf_to_geojson(dxf_path)
-        
-        # Convert GeoJSON to a formatted JSON string
-        geojson_str = json.dumps(geojson, indent=2)
-        
         st.success("Conversion successful! You can now download the GeoJSON file.")
-        
+
         st.download_button(
             label="Download GeoJSON",
-            data=geojson_str,
+            data=geojson_bytes,
             file_name="converted_drawing.geojson",
             mime="application/json"
         )
-        
-        # Display a preview of the GeoJSON
+
+        # Display a preview of the GeoJSON, skipped for large outputs so
+        # the rendered page does not re-materialize the whole document.
         st.subheader("GeoJSON Preview")
-        st.json(geojson)
-        
+        if len(geojson_bytes) <= 5 * 1024 * 1024:
+            st.json(geojson_bytes.decode())
+        else:
+            st.write("Preview skipped: output is larger than 5 MB.")
+
     except ValueError as ve:
         st.error(str(ve))
     except Exception as e:
         st.error(f"An unexpected error occurred: {str(e)}")
-    finally:
-        # Clean up temporary files
-        if 'dwg_path' in locals():
-            os.remove(dwg_path)
-        if 'dxf_path' in locals():
-            os.remove(dxf_path)
 
 st.write("Note: This app converts basic entities (points, lines, and polylines) from the model space of the DWG file to GeoJSON. Complex entities may not be fully supported.")